@@ -1,8 +1,17 @@
-from pickle import Pickler, _Unpickler as Unpickler
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from collections import ChainMap
+from itertools import chain, islice
 import numpy as np
 import functools
+import threading
+import hashlib
+import json
+import mmap
+import io
+import pickle
+import struct
+import queue
 import sys
 import os
 
@@ -19,16 +28,68 @@ def chunkify(iterable, n):
     >>> tuple(chunkify([], 100))       # Empty iterable example
     ([],)
     """
-    offset = 0
-    ret = [None]*n  # filled the majority of the time => avoid growing list
-    i = -1
-    for i, e in enumerate(iterable):
-        if i - offset == n:  # yield complete sublist and create a new list
-            yield ret
-            offset += n
-            ret = [None]*n
-        ret[i - offset] = e
-    yield ret[:i-offset+1]  # yield the incomplete subset ([] if i = -1)
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, n))
+    yield chunk  # [] if the iterable is empty
+    while len(chunk) == n:
+        chunk = list(islice(iterator, n))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _prefetched(iterable, n):
+    """Iterates over iterable from a background thread, which keeps up to n
+    elements ready in advance"""
+    ready = queue.Queue(maxsize=n)
+    stop = threading.Event()
+    end = object()
+
+    def put(element):
+        while not stop.is_set():
+            try:
+                ready.put(element, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for element in iterable:
+                if not put((element, None)):
+                    return
+        except BaseException as exc:
+            put((end, exc))
+        else:
+            put((end, None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            element, exc = ready.get()
+            if exc is not None:
+                raise exc
+            if element is end:
+                return
+            yield element
+    finally:
+        stop.set()
+        producer.join()
+
+
+_thread_pools = {}
+if hasattr(os, "register_at_fork"):  # the threads of the pools do not survive
+    os.register_at_fork(after_in_child=_thread_pools.clear)
+
+
+def _thread_pool(num_workers):
+    pool = _thread_pools.get(num_workers, None)
+    if pool is None:
+        pool = _thread_pools.setdefault(num_workers,
+                                        ThreadPoolExecutor(num_workers))
+    return pool
 
 
 class Dataset(metaclass=ABCMeta):
@@ -55,15 +116,22 @@ class Dataset(metaclass=ABCMeta):
         """
         pass
 
-    def query(self, keys, wrap=False):
+    def query(self, keys, wrap=False, *, num_workers=0):
         """Computes a batch, typically (X, Y) from the items (Xi, Yi) yielded
         by query_item(keys[i]).
 
         At this point, we consider keys is a list.
+
+        If num_workers > 0, the items are fetched concurrently by as many
+        threads in order to overlap the I/O latencies, query_item should then
+        be thread-safe. The items of the batch still follow the keys order.
         """
-        iterator = enumerate(keys)
-        _, key0 = next(iterator)
-        first = self.query_item(key0)
+        if num_workers > 0:
+            items = _thread_pool(num_workers).map(self.query_item, keys)
+        else:
+            items = map(self.query_item, keys)
+        iterator = enumerate(items)
+        _, first = next(iterator)
         if wrap:
             first = (first,)
         width = range(len(first))
@@ -72,21 +140,27 @@ class Dataset(metaclass=ABCMeta):
         for j in width:
             XYs[j][0] = first[j]
 
-        for i, key in iterator:
-            item = self.query_item(key)
+        for i, item in iterator:
             if wrap:
                 item = (item,)
             for j in width:
                 XYs[j][i] = item[j]
         return tuple(np.array(Xs) for Xs in XYs)
 
-    def batches(self, keys, batch_size, **kwargs):
+    def batches(self, keys, batch_size, *, prefetch=0, **kwargs):
         """Compute batches to make one epoch of the given keys
 
-        Remember to perform the shuffling of the keys before!
+        Remember to perform the shuffling of the keys before! kwargs are
+        forwarded to query (e.g. num_workers).
+
+        If prefetch > 0, the batches are computed by a background thread,
+        keeping up to prefetch batches ready while the current one is used.
         """
-        for key_chunk in chunkify(keys, batch_size):
-            yield self.query(key_chunk, **kwargs)
+        batches = (self.query(key_chunk, **kwargs)
+                   for key_chunk in chunkify(keys, batch_size))
+        if prefetch > 0:
+            batches = _prefetched(batches, prefetch)
+        yield from batches
 
     def balanced_batches(self, split_keys, batch_size, **kwargs):
         """Compute balanced batches to make one epoch with respect to the
@@ -102,9 +176,9 @@ class Dataset(metaclass=ABCMeta):
         # one parallel a tuple with 1 chunk of each
         for parallel in zip(*batched_keys):
             min_length = min(len(p) for p in parallel)
-            if min_length != batch_size:
+            if min_length != sub_sizes:
                 parallel = [p[:min_length] for p in parallel]
-            Xs, Ys = self.query(sum(parallel, []), **kwargs)
+            Xs, Ys = self.query(list(chain.from_iterable(parallel)), **kwargs)
             yield Xs, Ys
 
     @property
@@ -146,6 +220,10 @@ class Dataset(metaclass=ABCMeta):
                 if not self._recursive_equality(a[key], b[key]):
                     return False
             return True
+        if isinstance(a, np.ndarray) and isinstance(b, np.ndarray):
+            if a.shape != b.shape or a.dtype != b.dtype:
+                return False
+            return a is b or np.array_equal(a, b)
         if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
             return np.array_equal(a, b)
         return a == b
@@ -218,6 +296,49 @@ class TransformedDataset(Dataset):
         self.transforms = [(t, getattr(t, "needs_key", False))
                            for t in transforms]
 
+    def _update_transforms(self):
+        """Must be called after modifying self.transforms while frozen,
+        add_transform(s) take care of it"""
+        if "_pipeline" in self.__dict__:
+            self.freeze()
+
+    def freeze(self):
+        """Generates a function applying the transforms one after the other,
+        so that query_item does not loop over them anymore. Transforms added
+        afterwards are taken into account by generating it again.
+        """
+        namespace = {}
+        lines = ["def pipeline(key, item):"]
+        for i, (transform, needs_key) in enumerate(self.transforms):
+            name = "t{}".format(i)
+            namespace[name] = transform
+            args = "key, item" if needs_key else "item"
+            lines.append("    item = {}({})".format(name, args))
+        lines.append("    return item")
+        exec("\n".join(lines), namespace)
+        self._pipeline = namespace["pipeline"]
+        self.query_item = self._frozen_query_item
+        return self
+
+    def _frozen_query_item(self, key):
+        return self._pipeline(key, self.dataset.query_item(key))
+
+    def __getstate__(self):
+        # the generated pipeline cannot be pickled, it is generated again
+        state = self.__dict__.copy()
+        frozen = state.pop("_pipeline", None) is not None
+        state.pop("query_item", None)
+        return state, frozen
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):  # pickled before freeze existed
+            state, frozen = state, False
+        else:
+            state, frozen = state
+        self.__dict__.update(state)
+        if frozen:
+            self.freeze()
+
     def list_keys(self):
         return self.dataset.list_keys()
 
@@ -238,6 +359,7 @@ class TransformedDataset(Dataset):
                 needs_key = getattr(transform, "needs_key", False)
             item = (transform, needs_key)
             self.transforms.append(item)
+            self._update_transforms()
             return transform
         if transform is not None:
             return add_transform(transform)
@@ -246,6 +368,7 @@ class TransformedDataset(Dataset):
     def add_transforms(self, transforms):
         self.transforms.extend((t, getattr(t, "needs_key", False))
                                for t in transforms)
+        self._update_transforms()
 
 
 class CacheLastDataset(Dataset):
@@ -292,21 +415,29 @@ class AugmentedDataset(Dataset, metaclass=ABCMeta):
     def optimize_query_order(self, dataset):
         old_query = dataset.query
 
-        def query(keys):
-            keys.sort()
-            return old_query(keys)
+        def query(keys, **kwargs):
+            return old_query(sorted(keys), **kwargs)
         dataset.query = query
 
     def _augment(self, root_key):
-        if self.cache[0] != root_key:
+        cached_key, new_items = self.cache
+        if cached_key != root_key:
             root_item = self.dataset.query_item(root_key)
             new_items = dict(self.augment(root_key, root_item))
             self.cache = (root_key, new_items)
-        return self.cache[1]
+        return new_items
+
+    def augment_keys(self, root_key):
+        """Returns the keys augment produces from root_key. By default, the
+        root item is queried and augmented: subclasses which know the keys
+        without the item should override it so that list_keys does not read
+        the underlying dataset.
+        """
+        return self._augment(root_key).keys()
 
     def list_keys(self):
         for root_key in self.dataset.list_keys():
-            yield from self._augment(root_key).keys()
+            yield from self.augment_keys(root_key)
 
     def root_key(self, key):
         return key[0]
@@ -340,35 +471,110 @@ class FilteredDataset(AugmentedDataset):
         return key
 
 
+class _AutoCache(dict):
+    """A dict querying and storing the missing items by itself, so that a
+    cache hit is a single lookup"""
+    def __init__(self, producer):
+        self.producer = producer
+
+    def __missing__(self, key):
+        if self.producer is None:
+            raise KeyError(key)
+        item = self[key] = self.producer(key)
+        return item
+
+
 class CachedDataset(Dataset):
     """Creates a dataset caching the result of another"""
     def __init__(self, dataset):
         self.dataset = dataset
-        self.cache = {}
+        self.cache = _AutoCache(dataset.query_item)
 
     def _unforgotten_list_keys(self):
         return self.dataset.list_keys()
     list_keys = _unforgotten_list_keys
 
     def query_item(self, key):
-        tup = self.cache.get(key, None)
-        if tup is not None:
-            return tup
-        tup = self.dataset.query_item(key)
-        self.cache[key] = tup
-        return tup
+        return self.cache[key]
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if type(self.cache) is dict:  # pickled before _AutoCache existed
+            producer = None if self.dataset is None else self.dataset.query_item
+            self.cache = _AutoCache(producer)
+            self.cache.update(state["cache"])
 
     def _cached_keys(self):
         return self.cache.keys()
 
     def fill_forget(self):
-        for key in self.dataset.list_keys():
-            self.query_item(key)
+        cache, query_item = self.cache, self.dataset.query_item
+        cache.update((key, query_item(key))
+                     for key in self.dataset.list_keys() if key not in cache)
+        cache.producer = None
         self.list_keys = self._cached_keys
         self.dataset = None
         return self
 
 
+# Files starting with a pickle PROTO opcode (b"\x80") are in the legacy format
+_PICKLED_DATASET_MAGIC = b"MLWPD\x00\x00\x01"
+_record_header = struct.Struct("<QI")
+
+
+def _dump_record(file_handler, obj):
+    """Writes obj as a self-delimited record: the pickle is followed by its
+    out-of-band buffers (e.g. the data of contiguous arrays) written raw.
+
+    Returns the size of the record.
+    """
+    buffers = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    buffers = [buffer.raw() for buffer in buffers]
+    sizes = [buffer.nbytes for buffer in buffers]
+    header = struct.pack("<QI{}Q".format(len(sizes)),
+                         len(data), len(sizes), *sizes)
+    file_handler.writelines([header, data, *buffers])
+    return len(header) + len(data) + sum(sizes)
+
+
+def _load_record(mapped, offset):
+    """Loads the record at offset of a mapped file, see _map_file"""
+    data_size, n_buffers = _record_header.unpack_from(mapped, offset)
+    offset += _record_header.size
+    buffer_sizes = struct.unpack_from("<{}Q".format(n_buffers), mapped, offset)
+    offset += 8*n_buffers
+    view = memoryview(mapped)
+    data = view[offset:offset+data_size]
+    offset += data_size
+    buffers = []
+    for size in buffer_sizes:  # copied so that arrays are writable
+        buffers.append(bytearray(view[offset:offset+size]))
+        offset += size
+    return pickle.loads(data, buffers=buffers)
+
+
+def _map_file(file_handler):
+    """Returns the content of the file as a bytes-like object, memory-mapped
+    when possible so that reading a record does not need any syscall"""
+    try:
+        fileno = file_handler.fileno()
+    except (AttributeError, io.UnsupportedOperation):  # e.g. io.BytesIO
+        file_handler.seek(0)
+        return file_handler.read()
+    file_handler.flush()  # the mapping only sees what reached the file
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
+def _fingerprint_digest(dataset, fingerprint):
+    if fingerprint is None:
+        return None
+    # unlike pickles, sorted JSON is the same for equal values in any process
+    described = json.dumps([type(dataset).__qualname__, fingerprint],
+                           sort_keys=True)
+    return hashlib.blake2b(described.encode()).hexdigest()
+
+
 class PickledDataset(Dataset):
     """A dataset compacted on the disk with Pickle. For initial creation from
     an old dataset::
@@ -386,47 +592,82 @@ class PickledDataset(Dataset):
             model.fit(X, Y)
     """
     @staticmethod
-    def create(dataset, file_handler, keys=None):
+    def create(dataset, file_handler, keys=None, *, fingerprint=None):
+        """fingerprint is any JSON-serializable value describing how the
+        items are produced (e.g. a configuration or a version), stored hashed
+        along with the class name of dataset, see pickle_or_load"""
         if isinstance(file_handler, str):
-            with open(file_handler, "wb") as file_handler:
-                return PickledDataset.create(dataset, file_handler, keys=keys)
+            # written aside then moved onto the path, as truncating a file
+            # still mapped by a PickledDataset would crash the latter
+            path = file_handler
+            partial_path = "{}.{}.partial".format(path, os.getpid())
+            try:
+                with open(partial_path, "wb") as file_handler:
+                    PickledDataset.create(dataset, file_handler, keys=keys,
+                                          fingerprint=fingerprint)
+                os.replace(partial_path, path)
+            except BaseException:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
+            return
         index = {}
-        pickler = Pickler(file_handler)
         # allocate space for index offset
         file_handler.seek(0)
-        pickler.dump(1 << 65)  # 64 bits placeholder
+        file_handler.write(_PICKLED_DATASET_MAGIC)
+        file_handler.write(bytes(8))  # 64 bits placeholder
+        offset = file_handler.tell()
         if keys is None:
             keys = dataset.list_keys()
         for key in keys:
             # pickle objects and build index
-            index[key] = file_handler.tell()
+            index[key] = offset
             obj = dataset.query_item(key)
-            pickler.dump(obj)
-            pickler.memo.clear()
-        # put index and record offset
-        index_location = file_handler.tell()
-        pickler.dump(index)
-        # put context
+            offset += _dump_record(file_handler, obj)
+        # put index, context and fingerprint, record offset
+        index_location = offset
         context = getattr(dataset, "_context", None)
-        if context:
-            pickler.dump({**context})
+        _dump_record(file_handler, (index, {**context} if context else None,
+                                    _fingerprint_digest(dataset, fingerprint)))
         # put index offset at the beginning of the file
-        file_handler.seek(0)
-        index_location ^= 1 << 65
-        pickler.dump(index_location)
+        file_handler.seek(len(_PICKLED_DATASET_MAGIC))
+        file_handler.write(index_location.to_bytes(8, "little"))
 
     def __init__(self, file_handler, offset_keys=False):
         if isinstance(file_handler, str):
             file_handler = open(file_handler, "rb")
         self.file_handler = file_handler
         self.offset_keys = offset_keys
-        self.unpickler = unpickler = Unpickler(file_handler)
 
+        # items are read from the mapping, which is also thread-safe
+        self._mapped = _map_file(file_handler)
         # load the index offset then the index
-        file_handler.seek(0)
-        index_location = unpickler.load()
+        start = len(_PICKLED_DATASET_MAGIC)
+        self._legacy = self._mapped[:start] != _PICKLED_DATASET_MAGIC
+        if self._legacy:
+            self._init_legacy()
+        else:
+            index_location = int.from_bytes(self._mapped[start:start+8],
+                                            "little")
+            self.index, context, self.fingerprint = _load_record(
+                self._mapped, index_location)
+            if context is not None:
+                self._context = ChainMap(context)
+
+        if offset_keys:
+            self.list_keys = self._offset_list_keys
+            self.query_item = self._offset_query_item
+
+    def _init_legacy(self):
+        """Reads the index of a file in the legacy format, where everything is
+        pickled one object after the other"""
+        file_handler = self.file_handler
+        self.fingerprint = None
+        index_location = pickle.loads(self._mapped)
         index_location ^= 1 << 65
+        # the context may refer to the memo of the index, read them together
         file_handler.seek(index_location)
+        unpickler = pickle.Unpickler(file_handler)
         self.index = unpickler.load()
         # try to load the context if any
         try:
@@ -434,10 +675,6 @@ class PickledDataset(Dataset):
         except EOFError:
             pass
 
-        if offset_keys:
-            self.list_keys = self._offset_list_keys
-            self.query_item = self._default_query_item
-
     def __getstate__(self):
         return (self.file_handler.name, self.offset_keys)
 
@@ -450,43 +687,75 @@ class PickledDataset(Dataset):
         return self.index.values()
     list_keys = _default_list_keys
 
+    def _load_at(self, offset):
+        if not self._legacy:
+            return _load_record(self._mapped, offset)
+        # legacy items were pickled with a cleared memo, and loads() stops at
+        # the end of the pickle of the item
+        return pickle.loads(memoryview(self._mapped)[offset:])
+
     def _default_query_item(self, key):
-        self.file_handler.seek(self.index[key])
-        ret = self.unpickler.load()
-        self.unpickler.memo.clear()
-        return ret
+        return self._load_at(self.index[key])
     def _offset_query_item(self, key):
-        self.file_handler.seek(key)
-        return self.unpickler.load()
+        return self._load_at(key)
     query_item = _default_query_item
 
-    def optimize_query_order(self, dataset):
-        if not self.offset_keys:
-            def offset_of_key(key):
-                return self.index[key]
+    def _offset_order(self, keys):
+        if self.offset_keys:
+            offsets = np.asarray(keys, dtype=np.int64)
         else:
-            def offset_of_key(key):
-                return key
+            index = self.index
+            offsets = np.fromiter((index[key] for key in keys),
+                                  dtype=np.int64, count=len(keys))
+        return np.argsort(offsets, kind="stable")
+
+    def _sorted_by_offset(self, keys):
+        return [keys[i] for i in self._offset_order(keys)]
 
+    def optimize_query_order(self, dataset):
         old_query = dataset.query
 
-        def query(keys):
-            keys.sort(key=offset_of_key)
-            return old_query(keys)
+        def query(keys, **kwargs):
+            return old_query(self._sorted_by_offset(keys), **kwargs)
         dataset.query = query
 
+    def sequential_batches(self, keys, batch_size, dataset=None, **kwargs):
+        """Compute batches to make one epoch of the given keys, sorted by
+        their location in the file in order to read it almost sequentially.
+
+        Unlike optimize_query_order, the order is not only optimized within
+        each batch but over the whole epoch, so the keys end up unshuffled.
+        Each batch is thus yielded as (positions, batch), positions being the
+        indices in keys of the items of the batch, e.g. to fetch their
+        labels. The batches are computed by dataset (self by default),
+        typically one built on top of this one, kwargs being forwarded to its
+        batches method.
+        """
+        if dataset is None:
+            dataset = self
+        keys = list(keys)
+        order = self._offset_order(keys)
+        batches = dataset.batches([keys[i] for i in order], batch_size,
+                                  **kwargs)
+        for start, batch in zip(range(0, len(keys), batch_size), batches):
+            yield order[start:start+batch_size], batch
+
 
 class DiffReason(Exception):
     pass
 
 
 _open_pickles = weakref.WeakValueDictionary()
+_mapped_pickles = weakref.WeakValueDictionary()
 
 
 def _close(path):
     opened = _open_pickles.get(path, None)
     if opened is not None:
         opened.close()
+    mapped = _mapped_pickles.pop(path, None)
+    if mapped is not None:  # otherwise the file could not be removed
+        mapped.close()
 
 
 @functools.wraps(open)
@@ -497,10 +766,16 @@ def _open_once(path, *args, **kwargs):
 
 
 def pickle_or_load(dataset, path, keys=None, *, check_first_n_items=1, overwrite=False,
-                   before_pickling=None):
+                   before_pickling=None, fingerprint=None):
+    """Pickles dataset at path unless it already exists, and returns the
+    PickledDataset. The first items of an existing file are checked against
+    dataset, unless fingerprint (see PickledDataset.create) is given and
+    matches the one of the file, in which case dataset is not queried.
+    """
     from io import IOBase
     if isinstance(path, IOBase):
-        PickledDataset.create(dataset, path, keys=keys)
+        PickledDataset.create(dataset, path, keys=keys,
+                              fingerprint=fingerprint)
         return PickledDataset(path)
     was_existing = os.path.exists(path)
     if overwrite and was_existing:
@@ -508,17 +783,20 @@ def pickle_or_load(dataset, path, keys=None, *, check_first_n_items=1, overwrite
         os.remove(path)
         was_existing = False
     if not was_existing:
-        file = None
         if before_pickling is not None:
             before_pickling()
-        try:
-            with _open_once(path, "wb") as file:
-                PickledDataset.create(dataset, file, keys=keys)
-        except BaseException as exc:  # catch ALL exceptions
-            if file is not None:  # if the file has been created, it is partial
-                os.remove(path)
-            raise
+        # a partial file is removed on any exception
+        PickledDataset.create(dataset, path, keys=keys,
+                              fingerprint=fingerprint)
     opened_dataset = PickledDataset(_open_once(path, "rb"))
+    if isinstance(opened_dataset._mapped, mmap.mmap):
+        _mapped_pickles[path] = opened_dataset._mapped
+    digest = _fingerprint_digest(dataset, fingerprint)
+    if digest is not None:
+        if digest == opened_dataset.fingerprint:
+            return opened_dataset
+        sys.stderr.write("Warning: Pickled dataset at {} has been created "
+                         "with another fingerprint.\n".format(path))
     if keys is None:
         keys = dataset.list_keys()
     chunk = next(chunkify(keys, check_first_n_items))
@@ -560,24 +838,33 @@ def pickle_or_load(dataset, path, keys=None, *, check_first_n_items=1, overwrite
 
 
 try:
-    import blosc
+    import blosc2
 except ImportError:
     pass
 
 
 class BloscItem:
-    config = (9, "blosclz", True)
+    """Pickles an array compressed with Blosc2. config is (clevel, codec,
+    filter) with the codec and filter given by their blosc2.Codec and
+    blosc2.Filter names, e.g. "lz4" and "shuffle". The former boolean
+    shuffle flag is still accepted, True meaning "shuffle" and False
+    "nofilter". Pickles compressed with the former blosc are still readable.
+    """
+    config = (5, "zstd", "bitshuffle")
 
     def __init__(self, array):
         self.array = array
 
     def __reduce__(self):
-        _clevel, _cname, _shuffle = BloscItem.config
+        _clevel, _codec, _filter = BloscItem.config
+        if isinstance(_filter, bool):
+            _filter = "shuffle" if _filter else "nofilter"
         a = np.ascontiguousarray(self.array)
-        shape, size, dtype = a.shape, a.size, a.dtype
-        compressed = blosc.compress_ptr(a.__array_interface__['data'][0], size,
-                                        typesize=dtype.itemsize, clevel=_clevel,
-                                        cname=_cname, shuffle=_shuffle)
+        shape, dtype = a.shape, a.dtype
+        compressed = blosc2.compress2(a, typesize=dtype.itemsize,
+                                      clevel=_clevel,
+                                      codec=blosc2.Codec[_codec.upper()],
+                                      filters=[blosc2.Filter[_filter.upper()]])
         return BloscItem.unpickle, (shape, dtype, compressed,)
 
     @staticmethod
@@ -587,7 +874,8 @@ class BloscItem:
     @staticmethod
     def decompress(shape, dtype, compressed):
         array = np.empty(shape, dtype=dtype)
-        blosc.decompress_ptr(compressed, array.__array_interface__['data'][0])
+        if array.size:  # blosc2 refuses empty destinations
+            blosc2.decompress2(compressed, dst=array)
         return BloscItem(array)
 
     def __eq__(self, other):
@@ -2,6 +2,7 @@ from importlib import import_module
 import functools
 import json
 import re
+import sys
 
 
 _comment_remover = re.compile(r'//[^\n]*|/\*.*?\*/', re.RegexFlag.MULTILINE|re.RegexFlag.DOTALL)
@@ -13,8 +14,9 @@ def _replacer(match):
 
 
 def remove_comments(jsonc_string):
-    jsonc_string = re.sub(_comment_remover, '', jsonc_string)
-    jsonc_string = re.sub(_comma_remover, _replacer, jsonc_string)
+    if "/" in jsonc_string:  # otherwise there cannot be any comment
+        jsonc_string = _comment_remover.sub('', jsonc_string)
+    jsonc_string = _comma_remover.sub(_replacer, jsonc_string)
     return jsonc_string
 
 
@@ -129,13 +131,18 @@ def update_dict(dic, update):
             d[int(n)] = value_to_set
 
 
+_containers = (dict, list)
+
+
 def eval_json(json, env):
     """Should be called 2nd, after preprocessing. Simply meant to allow more complicated
     structures (e.g. creating of dict with int keys) from JSON"""
     if isinstance(json, dict):
         parsed = {}
         for k, v in json.items():
-            parsed[k] = eval_json(v, env)
+            if isinstance(v, _containers):  # only containers hold calls
+                v = eval_json(v, env)
+            parsed[k] = v
         call = parsed.pop("_call", None)
         if call is not None:
             if call.startswith("!"):
@@ -147,7 +154,8 @@ def eval_json(json, env):
             parsed = call(*args, **parsed)
         return parsed
     elif isinstance(json, list):
-        return [eval_json(l, env) for l in json]
+        return [eval_json(l, env) if isinstance(l, _containers) else l
+                for l in json]
     return json
 
 
@@ -160,7 +168,9 @@ def _resolve_calls(json, env):
     if isinstance(json, dict):
         parsed = {}
         for k, v in json.items():
-            parsed[k] = _resolve_calls(v, env)
+            if isinstance(v, _containers):
+                v = _resolve_calls(v, env)
+            parsed[k] = v
         call = parsed.pop("_call", None)
         if call is not None:
             if call.startswith("!"):
@@ -172,11 +182,34 @@ def _resolve_calls(json, env):
             parsed = Call(call, args=args, kwargs=parsed)
         return parsed
     elif isinstance(json, list):
-        return [_resolve_calls(l, env) for l in json]
+        return [_resolve_calls(l, env) if isinstance(l, _containers) else l
+                for l in json]
     return json
 
 
+# Module objects survive importlib.reload, so only the module lookup is
+# memoized and the attributes are still resolved on every evaluation. A module
+# is only reused while it is the one in sys.modules, so that modules replaced
+# or removed there are imported again.
+_imported_modules = {}
+
+
+def _import_module(name):
+    module = _imported_modules.get(name)
+    if module is None or sys.modules.get(name) is not module:
+        module = _imported_modules[name] = import_module(name)
+    return module
+
+
+def clear_import_cache():
+    """Forgets the modules memoized for evaluating Calls, e.g. after
+    redirecting imports as mlworkflow.versioning.imports does"""
+    _imported_modules.clear()
+
+
 class Call(dict):
+    __slots__ = ()  # everything is stored as items, spare instances a __dict__
+
     def __init__(self, fun, module=None, *, args=[], kwargs={}, partial=False):
         super().__init__()
         self["_call"] = "Call"
@@ -198,9 +231,19 @@ class Call(dict):
                     partial=self["partial"])
 
     def with_args(self, *args):
-        new_args = sum(((arg,) if arg is not Ellipsis else self["args"]
-                        for arg in args
-                        ), ())
+        """Returns the Call with the given positional arguments, in which
+        Ellipsis stands for the current ones"""
+        if not any(arg is Ellipsis for arg in args):  # nothing to splice
+            new_args = args
+        else:
+            old_args = self["args"]
+            new_args = []
+            for arg in args:
+                if arg is Ellipsis:
+                    new_args.extend(old_args)
+                else:
+                    new_args.append(arg)
+            new_args = tuple(new_args)
         return Call(self["fun"], self["module"],
                     args=new_args, kwargs=self["kwargs"],
                     partial=self["partial"])
@@ -220,6 +263,14 @@ class Call(dict):
                     args=self["args"], kwargs=self["kwargs"],
                     partial=False)
 
+    def __reduce__(self):
+        return Call._v0, (self["fun"], self["module"], self["args"],
+                          self["kwargs"], self["partial"])
+
+    @staticmethod
+    def _v0(fun, module, args, kwargs, partial):
+        return Call(fun, module, args=args, kwargs=kwargs, partial=partial)
+
     @staticmethod
     def resolve(json, env):
         """Go from _call to Call"""
@@ -236,7 +287,7 @@ class Call(dict):
 
     @staticmethod
     def _eval_call(fun, module, args, kwargs, partial):
-        callee = import_module(module)
+        callee = _import_module(module)
         for f in fun.split("."):
             callee = getattr(callee, f)
         if partial:
@@ -1,4 +1,5 @@
 from mlworkflow.file_handling import _format_filename, find_files
+from mlworkflow.json_handling import clear_import_cache
 from contextlib import contextmanager
 import importlib
 import builtins
@@ -37,10 +38,12 @@ def imports(**redirections):
     try:
         builtins.__import__ = import_
         importlib._bootstrap._find_and_load = find_and_load_
+        clear_import_cache()
         yield
     finally:
         builtins.__import__ = _import
         importlib._bootstrap._find_and_load = _find_and_load
+        clear_import_cache()
 
 
 class TimeCapsule:
@@ -9,7 +9,7 @@ setup(
     url="https://github.com/mistasse/mlworkflow",
     license='MIT',
     version="0.9.0",
-    python_requires='>=3.6',
+    python_requires='>=3.8',
     description="A workflow-improving library for manipulating ML experiments",
     long_description_content_type="text/markdown",
     packages=find_packages(include=("mlworkflow",)),
@@ -0,0 +1,353 @@
+import os
+import pytest
+import numpy as np
+from mlworkflow import DictDataset
+
+
+class CountingDataset(DictDataset):
+    """Records the keys of the queried items"""
+    def __init__(self, dic):
+        super().__init__(dic)
+        self.queried = []
+
+    def query_item(self, key):
+        self.queried.append(key)
+        return super().query_item(key)
+
+
+def test_query_stacks_fixed_columns():
+    d = DictDataset({i: (np.full((2, 3), i, dtype=np.float32), i, "x"*i)
+                     for i in range(4)})
+    X, y, s = d.query([0, 1, 2, 3])
+    assert X.shape == (4, 2, 3) and X.dtype == np.float32
+    assert np.array_equal(X[:, 0, 0], [0, 1, 2, 3])
+    assert y.dtype == np.int64 and list(y) == [0, 1, 2, 3]
+    assert list(s) == ["", "x", "xx", "xxx"]
+
+
+def test_query_falls_back_on_varying_columns():
+    d = DictDataset({0: (1, np.zeros(2, np.float32)),
+                     1: (1.5, np.zeros(2, np.float64)),
+                     2: (2**70, np.zeros(2, np.float32))})
+    X, Y = d.query([0, 1])
+    assert list(X) == [1, 1.5]
+    assert Y.dtype == np.float64
+    X, Y = d.query([0, 2])
+    assert X.dtype == object and X[1] == 2**70
+    assert Y.dtype == np.float32
+
+
+def test_query_num_workers(tmp_path):
+    from mlworkflow import PickledDataset
+    path = str(tmp_path / "dataset.pickle")
+    d = DictDataset({i: (np.full(3, i), str(i)) for i in range(100)})
+    PickledDataset.create(d, path)
+    pd = PickledDataset(path)
+    keys = list(range(100))[::-1]
+    for X, Y in pd.batches(keys, 32, num_workers=4):
+        assert np.array_equal(X[:, 0], [int(y) for y in Y])
+    X, Y = pd.query(keys, num_workers=4)
+    assert list(X[:, 0]) == keys
+
+
+def test_batches_prefetch():
+    d = DictDataset({i: (i, -i) for i in range(10)})
+    batches = list(d.batches(list(range(10)), 3, prefetch=2))
+    assert [list(X) for X, _ in batches] == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+
+    gen = d.batches(list(range(10)), 3, prefetch=1)
+    X, Y = next(gen)
+    gen.close()  # the producer thread stops
+
+    d.dic[5] = (5,)
+    with pytest.raises(IndexError):
+        list(d.batches(list(range(10)), 3, prefetch=1))
+
+
+def test_transformed_dataset():
+    from mlworkflow import TransformedDataset
+    d = TransformedDataset(DictDataset({0: 1, 1: 2}), [lambda x: x*10])
+    assert d.query_item(1) == 20
+
+    @d.add_transform(needs_key=True)
+    def add_key(key, item):
+        return item + key
+    d.add_transforms([lambda x: -x])
+    assert d.query_item(1) == -21
+
+
+def test_transformed_dataset_direct_append():
+    from mlworkflow import TransformedDataset
+    d = TransformedDataset(DictDataset({0: 1}), [lambda x: x*10])
+    assert d.query_item(0) == 10
+    d.transforms.append((lambda x: x+1, False))
+    assert d.query_item(0) == 11
+
+
+def test_cached_dataset():
+    from mlworkflow import CachedDataset
+    d = CachedDataset(CountingDataset({0: None, 1: (1,), 2: (2,)}))
+    calls = d.dataset.queried
+    assert d.query_item(0) is None and d.query_item(0) is None
+    assert d.query_item(1) == (1,)
+    assert calls == [0, 1]
+    d.fill_forget()
+    assert calls == [0, 1, 2]
+    assert list(d.list_keys()) == [0, 1, 2]
+    with pytest.raises(KeyError):
+        d.query_item(3)
+
+
+def test_cached_dataset_legacy_state():
+    import pickle
+    from mlworkflow import CachedDataset
+    d = CachedDataset(DictDataset({0: (0,), 1: (1,)}))
+    d.cache = {0: (0,)}  # as pickled before the cache queried by itself
+    d = pickle.loads(pickle.dumps(d))
+    assert d.query_item(1) == (1,) and 1 in d.cache
+
+
+def test_sequential_batches(tmp_path):
+    from mlworkflow import PickledDataset, TransformedDataset
+    path = str(tmp_path / "dataset.pickle")
+    PickledDataset.create(DictDataset({i: (i,) for i in range(10)}), path)
+    pd = PickledDataset(path)
+    d = TransformedDataset(pd, [lambda x: (-x[0],)])
+    batches = pd.sequential_batches([3, 1, 9, 0, 2], 2, dataset=d)
+    batches = list(batches)
+    assert [list(X) for _, (X,) in batches] == [[0, -1], [-2, -3], [-9]]
+    assert [list(p) for p, _ in batches] == [[3, 1], [4, 0], [2]]
+
+
+def test_pickled_dataset_roundtrip(tmp_path):
+    from mlworkflow import PickledDataset
+    path = str(tmp_path / "dataset.pickle")
+    items = {"a": (np.arange(6).reshape(2, 3), "x"),
+             "b": (np.asfortranarray(np.ones((3, 2))), [np.zeros(2)])}
+    PickledDataset.create(DictDataset(items), path)
+    pd = PickledDataset(path)
+    for key in "ab":
+        assert pd.items_equality(pd.query_item(key), items[key])
+    pd.query_item("a")[0][...] = 0  # arrays are writable
+
+    pd = PickledDataset(path, offset_keys=True)
+    assert [pd.query_item(k)[1] for k in pd.list_keys()][0] == "x"
+
+
+def test_pickled_dataset_recreated_while_open(tmp_path):
+    from mlworkflow import PickledDataset, pickle_or_load
+    path = str(tmp_path / "dataset.pickle")
+    PickledDataset.create(DictDataset({i: (i,) for i in range(20)}), path)
+    pd = PickledDataset(path)
+    PickledDataset.create(DictDataset({0: (0,)}), path)
+    assert pd.query_item(19) == (19,)  # still reads the former file
+    assert len(PickledDataset(path).index) == 1
+
+    pd = pickle_or_load(DictDataset({0: (0,)}), path)
+    pickle_or_load(DictDataset({0: (1,)}), path, overwrite=True)
+    with pytest.raises(ValueError):  # the mapping has been released
+        pd.query_item(0)
+
+    class Failing(DictDataset):
+        def query_item(self, key):
+            raise RuntimeError
+    with pytest.raises(RuntimeError):
+        PickledDataset.create(Failing({0: (0,)}), path)
+    assert os.listdir(str(tmp_path)) == ["dataset.pickle"]
+
+
+def test_pickled_dataset_legacy_format(tmp_path):
+    from pickle import Pickler
+    from mlworkflow import PickledDataset
+    path = str(tmp_path / "dataset.pickle")
+    with open(path, "wb") as file_handler:  # how files used to be written
+        pickler = Pickler(file_handler)
+        pickler.dump(1 << 65)
+        index = {}
+        for key in range(3):
+            index[key] = file_handler.tell()
+            pickler.dump((key, np.full(2, key)))
+            pickler.memo.clear()
+        index_location = file_handler.tell()
+        pickler.dump(index)
+        file_handler.seek(0)
+        pickler.dump(index_location ^ (1 << 65))
+    pd = PickledDataset(path)
+    X, Y = pd.query([2, 0, 1], num_workers=2)
+    assert list(X) == [2, 0, 1] and np.array_equal(Y[:, 1], X)
+
+
+def test_pickled_dataset_in_memory_file():
+    import io
+    from mlworkflow import PickledDataset
+    file_handler = io.BytesIO()
+    PickledDataset.create(DictDataset({0: (np.ones(3),)}), file_handler)
+    pd = PickledDataset(file_handler)
+    assert np.array_equal(pd.query_item(0)[0], np.ones(3))
+
+
+def test_blosc_item():
+    import pickle
+    from mlworkflow import BloscItem
+    pytest.importorskip("blosc2")
+    for array in [np.arange(1000, dtype=np.float32).reshape(10, 100),
+                  np.zeros((0, 3)), np.arange(10)[::2]]:
+        item = pickle.loads(pickle.dumps(BloscItem(array)))
+        assert item == BloscItem(array)
+
+
+def test_blosc_item_shuffle_flag(monkeypatch):
+    import pickle
+    from mlworkflow import BloscItem
+    pytest.importorskip("blosc2")
+    array = np.arange(1000, dtype=np.float32)
+    for shuffle in [True, False]:
+        monkeypatch.setattr(BloscItem, "config", (9, "blosclz", shuffle))
+        item = pickle.loads(pickle.dumps(BloscItem(array)))
+        assert item == BloscItem(array)
+
+
+def test_pickled_dataset_context(tmp_path):
+    from mlworkflow import PickledDataset, TransformedDataset
+    path = str(tmp_path / "dataset.pickle")
+    d = TransformedDataset(DictDataset({0: (0,)}))
+    PickledDataset.create(d, path)
+    assert "_context" not in vars(PickledDataset(path))
+    d.context["scale"] = 4
+    PickledDataset.create(d, path)
+    assert PickledDataset(path).context["scale"] == 4
+
+
+def test_items_equality():
+    d = DictDataset({})
+    a = np.arange(6)
+    assert d.items_equality((a, {"b": [a]}), (a.copy(), {"b": [a.copy()]}))
+    assert not d.items_equality((a,), (a.reshape(2, 3),))
+    assert not d.items_equality((a,), (a.astype(np.int32),))
+    assert d.items_equality((a,), (list(a),))
+
+
+def test_augment_keys():
+    from mlworkflow import AugmentedDataset
+    class PermutingDataset(AugmentedDataset):
+        def augment(self, root_key, root_item):
+            yield (root_key, 0), root_item
+            yield (root_key, 1), root_item[::-1]
+        def augment_keys(self, root_key):
+            return [(root_key, 0), (root_key, 1)]
+    d = PermutingDataset(CountingDataset({0: ("a", "b"), 1: ("c", "d")}))
+    queried = d.dataset.queried
+    assert list(d.list_keys()) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert queried == []
+    assert d.query_item((1, 1)) == ("d", "c")
+
+
+def test_optimize_query_order(tmp_path):
+    from mlworkflow import PickledDataset, TransformedDataset
+    path = str(tmp_path / "dataset.pickle")
+    PickledDataset.create(DictDataset({i: (i,) for i in range(5)}), path)
+    for offset_keys in (False, True):
+        pd = PickledDataset(path, offset_keys=offset_keys)
+        d = TransformedDataset(pd)
+        pd.optimize_query_order(d)
+        keys = list(pd.list_keys())[::-1]
+        X, = d.query(keys, num_workers=2)
+        assert list(X) == [0, 1, 2, 3, 4]
+        assert keys == list(pd.list_keys())[::-1]  # left untouched
+
+
+def test_frozen_transformed_dataset():
+    from mlworkflow import TransformedDataset
+    d = TransformedDataset(DictDataset({0: 1, 1: 2}), [lambda x: x*10])
+    assert d.freeze().query_item(1) == 20
+    d.add_transform(lambda key, item: item + key, needs_key=True)
+    assert d.query_item(1) == 21
+    assert TransformedDataset(DictDataset({0: 1})).freeze().query_item(0) == 1
+
+
+def _times_ten(x):
+    return x*10
+
+
+def test_frozen_transformed_dataset_pickling():
+    import pickle
+    from mlworkflow import TransformedDataset
+    d = TransformedDataset(DictDataset({0: 1, 1: 2}), [_times_ten]).freeze()
+    d = pickle.loads(pickle.dumps(d))
+    assert "_pipeline" in d.__dict__ and d.query_item(1) == 20
+    d = pickle.loads(pickle.dumps(TransformedDataset(d, [_times_ten])))
+    assert "_pipeline" not in d.__dict__ and d.query_item(1) == 200
+
+
+def test_query_stacks_large_arrays():
+    d = DictDataset({i: (np.full((128, 128), i),) for i in range(3)})
+    d.dic[3] = (np.ones((128, 128), dtype=np.float32),)
+    X, = d.query([0, 1, 2])
+    assert X.shape == (3, 128, 128) and np.array_equal(X[:, 0, 0], [0, 1, 2])
+    X, = d.query([0, 1, 3])
+    assert X.dtype == np.float64 and list(X[:, 0, 0]) == [0, 1, 1]
+
+
+def test_balanced_batches():
+    d = DictDataset({i: (i, i % 2) for i in range(10)})
+    batches = list(d.balanced_batches([[0, 2, 4, 6, 8], [1, 3, 5]], 4))
+    assert [list(X) for X, _ in batches] == [[0, 2, 1, 3], [4, 5]]
+
+
+def test_pickle_or_load_fingerprint(tmp_path, capsys):
+    from mlworkflow import pickle_or_load
+    path = str(tmp_path / "dataset.pickle")
+    d = CountingDataset({0: (0,), 1: (1,)})
+    queried = d.queried
+    pickle_or_load(d, path, fingerprint={"version": 1})
+    del queried[:]
+    pd = pickle_or_load(d, path, fingerprint={"version": 1})
+    assert queried == [] and pd.query_item(1) == (1,)
+    pickle_or_load(d, path, fingerprint={"version": 2})
+    assert queried == [0]
+    assert "another fingerprint" in capsys.readouterr().err
+    pickle_or_load(d, path, overwrite=True, fingerprint={"a": 1, "b": [2]})
+    del queried[:]
+    pickle_or_load(d, path, fingerprint={"b": [2], "a": 1})
+    assert queried == [] and "another" not in capsys.readouterr().err
+    with pytest.raises(TypeError):
+        pickle_or_load(d, path, fingerprint={"tags": {"a", "b"}})
+
+
+def test_pickle_or_load_file_handler(tmp_path):
+    from mlworkflow import pickle_or_load
+    d = DictDataset({0: (0,), 1: (1,)})
+    with open(str(tmp_path / "dataset.pickle"), "w+b") as file:
+        pd = pickle_or_load(d, file)
+        assert pd.query_item(1) == (1,)
+
+
+def test_query_keeps_datetime_units():
+    d = DictDataset({0: (np.datetime64("2020-01-01"),),
+                     1: (np.datetime64("2020-01-01T12:00"),),
+                     2: (np.timedelta64(1, "D"),),
+                     3: (np.timedelta64(90, "m"),)})
+    X, = d.query([0, 1])
+    assert X.dtype == np.dtype("datetime64[m]")
+    assert X[1] == np.datetime64("2020-01-01T12:00")
+    X, = d.query([2, 3])
+    assert X[1] == np.timedelta64(90, "m")
+
+
+def _query_in_child(d):
+    X, = d.query([0, 1, 2], num_workers=2)
+    assert list(X) == [0, 1, 2]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_query_num_workers_after_fork():
+    import multiprocessing
+    d = DictDataset({i: (i,) for i in range(3)})
+    d.query([0, 1, 2], num_workers=2)  # creates the pool in the parent
+    child = multiprocessing.get_context("fork").Process(
+        target=_query_in_child, args=(d,))
+    child.start()
+    child.join(10)
+    if child.is_alive():
+        child.kill()
+    assert child.exitcode == 0
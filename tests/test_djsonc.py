@@ -54,3 +54,37 @@ def test_comments():
     import json
     with pytest.raises(json.JSONDecodeError):
         djsonc_loads('''[],''')
+
+
+def test_call_with_args():
+    from mlworkflow import Call
+    call = Call(max, args=[1, 2])
+    assert call.with_args(0, ..., 3)["args"] == (0, 1, 2, 3)
+    assert call.with_args(..., ...)["args"] == (1, 2, 1, 2)
+    assert Call(abs, args=[-1]).with_args(-5).eval() == 5
+
+
+def test_call_eval():
+    from mlworkflow import Call
+    call = Call(dict, kwargs={"a": [1, Call(abs, args=[-2])], "b": "x"})
+    assert call.eval() == {"a": [1, 2], "b": "x"}
+    assert call.partial().eval()(c=3) == {"a": [1, 2], "b": "x", "c": 3}
+
+
+def test_call_pickling():
+    import pickle
+    from mlworkflow import Call
+    call = Call(abs, args=[Call(abs, args=[-1])]).partial()
+    loaded = pickle.loads(pickle.dumps(call))
+    assert loaded == call and type(loaded["args"][0]) is Call
+
+
+def test_call_replaced_module(monkeypatch):
+    import sys
+    from types import ModuleType
+    from mlworkflow import Call
+    for value in [1, 2]:
+        module = ModuleType("_replaced_module")
+        module.value = lambda value=value: value
+        monkeypatch.setitem(sys.modules, "_replaced_module", module)
+        assert Call("value", "_replaced_module").eval() == value